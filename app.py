@@ -1,49 +1,142 @@
 import os
 import logging
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
+import math
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+from functools import lru_cache
+import orjson
+from flask import Flask, current_app, render_template, request, jsonify, send_file, redirect, url_for
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import DeclarativeBase
-from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase, joinedload, validates
+from datetime import datetime, timedelta, timezone
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib.units import inch
-from io import BytesIO
 
-# Configure logging for debugging
-logging.basicConfig(level=logging.DEBUG)
+# Debug mode (reloader, debugger and DEBUG logging) is opt-in via FLASK_DEBUG=1
+DEBUG = os.environ.get('FLASK_DEBUG') == '1'
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG if DEBUG else logging.INFO)
 
 class Base(DeclarativeBase):
     pass
 
+def orjson_default(obj):
+    """Serialize the types orjson doesn't handle natively"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson, used by jsonify, request.get_json and returned dicts"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=orjson_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Same argument rules as jsonify: one positional value, several (a list), or keywords (a dict)
+        if args and kwargs:
+            raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+        obj = args[0] if len(args) == 1 else args or kwargs or None
+        # Pass orjson's bytes straight to the response rather than round-tripping through str
+        return current_app.response_class(
+            orjson.dumps(obj, default=orjson_default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype='application/json'
+        )
+
 # Create the Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-for-pricing-preview")
 
 # Database configuration
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
+# Connection pool settings, overridable per deployment. Size the pool to the number of
+# threads that can hold a connection at once: pool_size ~ workers x threads per worker,
+# with max_overflow as burst headroom. pool_recycle stays below the server's idle
+# timeout; set DB_POOL_PRE_PING=0 to skip the per-checkout ping.
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", 20)),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 30)),
+    "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", 30)),
+    "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 280)),
+    "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "1") == "1",
 }
+USING_POSTGRES = (app.config["SQLALCHEMY_DATABASE_URI"] or "").startswith(("postgres://", "postgresql"))
+
+# On PostgreSQL, fail fast on unreachable servers and cap runaway request queries;
+# startup maintenance and background exports lift the cap via without_statement_timeout()
+if USING_POSTGRES:
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"]["connect_args"] = {
+        "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+        "options": f"-c statement_timeout={int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 10000))}",
+    }
 
 db = SQLAlchemy(model_class=Base)
 db.init_app(app)
 
+_statement_timeout_lifted = threading.local()
+
+@contextmanager
+def without_statement_timeout():
+    """Run long maintenance work on this thread without the per-connection statement cap"""
+    previous = getattr(_statement_timeout_lifted, 'active', False)
+    _statement_timeout_lifted.active = True
+    try:
+        yield
+    finally:
+        _statement_timeout_lifted.active = previous
+
+@event.listens_for(Engine, 'begin')
+def lift_statement_timeout(conn):
+    """Disable statement_timeout for transactions begun inside without_statement_timeout()"""
+    if getattr(_statement_timeout_lifted, 'active', False) and conn.dialect.name == 'postgresql':
+        conn.exec_driver_sql('SET LOCAL statement_timeout = 0')
+
+def utcnow():
+    """Current UTC time as a naive datetime, matching how timestamps are stored"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def digits_only(text):
+    """Strip everything but digits, e.g. '+91 98765-43210' -> '919876543210'"""
+    return ''.join(char for char in text or '' if char.isdigit())
+
+def format_ddmmyyyy(value):
+    """Format a date or datetime as DD-MM-YYYY without parsing a strftime pattern"""
+    return f"{value.day:02d}-{value.month:02d}-{value.year:04d}"
+
 # Database Models
 class Customer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     phone = db.Column(db.String(15), nullable=False)
+    phone_digits = db.Column(db.String(15))  # phone without spaces or punctuation, for search
     address = db.Column(db.Text)
     aadhar_number = db.Column(db.String(12))
     email = db.Column(db.String(120))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow)
     
-    # Relationships
-    bills = db.relationship('Bill', backref='customer', lazy=True)
-    payments = db.relationship('Payment', backref='customer', lazy=True)
+    # Relationships, never lazy-loaded: load them explicitly so N+1 queries fail loudly
+    bills = db.relationship('Bill', back_populates='customer', lazy='raise_on_sql')
+    payments = db.relationship('Payment', back_populates='customer', lazy='raise_on_sql')
     
     @property
     def outstanding_balance(self):
@@ -58,10 +151,42 @@ class Customer(db.Model):
         ).scalar() or 0
         
         return total_bills - total_payments
+    
+    @validates('phone')
+    def sync_phone_digits(self, key, phone):
+        """Keep phone_digits in step with phone"""
+        self.phone_digits = digits_only(phone)
+        return phone
+    
+    # Trigram indexes let PostgreSQL serve the '%q%' customer search
+    __table_args__ = (
+        db.Index('ix_customer_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_customer_phone_digits_trgm', 'phone_digits', postgresql_using='gin',
+                 postgresql_ops={'phone_digits': 'gin_trgm_ops'}),
+    )
+
+# Bill numbers come from a database sequence so concurrent bills never collide
+bill_number_seq = db.Sequence('bill_number_seq', metadata=db.metadata)
+
+def bill_number_sql():
+    """SQL for the next bill number, e.g. KK-2025-000042, computed inside the INSERT"""
+    if not USING_POSTGRES:
+        # SQLite has no sequences; number after the highest bill id, which its single writer keeps unique
+        bill_ids = db.table('bill', db.column('id'))
+        serial = db.select(db.func.coalesce(db.func.max(bill_ids.c.id), 0) + 1).scalar_subquery()
+        return db.literal('KK-') + db.func.strftime('%Y', 'now') + '-' + db.func.printf('%06d', serial)
+    
+    serial = db.select(bill_number_seq.next_value().label('value')).subquery()
+    digits = db.cast(serial.c.value, db.String)
+    padded = db.select(
+        db.func.lpad(digits, db.func.greatest(6, db.func.length(digits)), '0')
+    ).scalar_subquery()
+    return db.literal('KK-') + db.func.to_char(db.func.now(), 'YYYY') + '-' + padded
 
 class Bill(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    bill_number = db.Column(db.String(20), unique=True, nullable=False)
+    bill_number = db.Column(db.String(20), unique=True, nullable=False, default=bill_number_sql())
     customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=True)
     customer_name = db.Column(db.String(100))  # For cash customers without account
     
@@ -77,10 +202,19 @@ class Bill(db.Model):
     
     # Staff and metadata
     generated_by = db.Column(db.String(100))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow)
     
     # Relationships
-    items = db.relationship('BillItem', backref='bill', lazy=True, cascade='all, delete-orphan')
+    customer = db.relationship('Customer', back_populates='bills')
+    items = db.relationship('BillItem', back_populates='bill', lazy=True, cascade='all, delete-orphan')
+    
+    # Fetch the generated bill number with RETURNING on insert
+    __mapper_args__ = {'eager_defaults': True}
+    
+    __table_args__ = (
+        db.Index('ix_bill_customer_status', 'customer_id', 'payment_status'),
+        db.Index('ix_bill_status_created', 'payment_status', 'created_at'),
+    )
 
 class BillItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -94,6 +228,18 @@ class BillItem(db.Model):
     # For weight-based items
     weight = db.Column(db.Float)
     price_per_kg = db.Column(db.Float)
+    
+    # Product cost details at time of sale (null when the item matched no product)
+    cost_price = db.Column(db.Float)
+    is_weight_based = db.Column(db.Boolean, default=False)
+    
+    # Relationships
+    bill = db.relationship('Bill', back_populates='items')
+    
+    __table_args__ = (
+        db.Index('ix_billitem_bill', 'bill_id'),
+        db.Index('ix_billitem_item_name', 'item_name'),
+    )
 
 class Payment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -104,8 +250,15 @@ class Payment(db.Model):
     payment_mode = db.Column(db.String(20), nullable=False)  # cash, online, upi, card
     reference_number = db.Column(db.String(50))  # For online payments
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow)
     notes = db.Column(db.Text)
+    
+    # Relationships
+    customer = db.relationship('Customer', back_populates='payments')
+    
+    __table_args__ = (
+        db.Index('ix_payment_customer', 'customer_id'),
+    )
 
 class Product(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -124,8 +277,17 @@ class Product(db.Model):
     reorder_level = db.Column(db.Integer, default=10)
     expiry_date = db.Column(db.Date)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow)
+    updated_at = db.Column(db.DateTime, default=utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_product_name', 'name'),
+        db.Index('ix_product_expiry', 'expiry_date'),
+        db.Index('ix_product_low_stock', 'id',
+                 postgresql_where=db.text('stock_quantity <= reorder_level')),
+    )
+
+UNREAD_PRODUCT_NOTIFICATION = db.text('is_read = false AND product_id IS NOT NULL')
 
 class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -134,12 +296,21 @@ class Notification(db.Model):
     type = db.Column(db.String(50), nullable=False)  # subscription, backup, inventory, payment, system
     priority = db.Column(db.String(20), default='medium')  # low, medium, high, urgent
     is_read = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow)
     
     # Optional references
     customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=True)
     bill_id = db.Column(db.Integer, db.ForeignKey('bill.id'), nullable=True)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=True)
+    
+    # At most one unread alert of each type per product; the unread feed is read
+    # newest-first through ix_notification_unread_created
+    __table_args__ = (
+        db.Index('uq_notification_unread_product', 'type', 'product_id', unique=True,
+                 postgresql_where=UNREAD_PRODUCT_NOTIFICATION,
+                 sqlite_where=UNREAD_PRODUCT_NOTIFICATION),
+        db.Index('ix_notification_unread_created', 'is_read', 'created_at'),
+    )
 
 class NotificationSettings(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -161,8 +332,67 @@ class NotificationSettings(db.Model):
     backup_alerts = db.Column(db.Boolean, default=True)
     subscription_alerts = db.Column(db.Boolean, default=True)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow)
+    updated_at = db.Column(db.DateTime, default=utcnow)
+
+# One-time data migrations already applied to this database
+class SchemaMigration(db.Model):
+    name = db.Column(db.String(100), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=utcnow)
+
+def get_outstanding_balances(customer_ids=None):
+    """Get outstanding balance per customer id using two grouped SUM queries"""
+    bills_query = db.session.query(Bill.customer_id, db.func.sum(Bill.total_amount)).filter(
+        Bill.customer_id.isnot(None),
+        Bill.payment_status != 'paid'
+    )
+    payments_query = db.session.query(Payment.customer_id, db.func.sum(Payment.amount))
+    
+    if customer_ids is not None:
+        bills_query = bills_query.filter(Bill.customer_id.in_(customer_ids))
+        payments_query = payments_query.filter(Payment.customer_id.in_(customer_ids))
+    
+    bill_totals = dict(bills_query.group_by(Bill.customer_id).all())
+    payment_totals = dict(payments_query.group_by(Payment.customer_id).all())
+    
+    return {
+        customer_id: (bill_totals.get(customer_id) or 0) - (payment_totals.get(customer_id) or 0)
+        for customer_id in bill_totals.keys() | payment_totals.keys()
+    }
+
+def get_total_outstanding():
+    """Get the total outstanding balance across all customers using two SUM queries"""
+    total_bills = db.session.query(db.func.sum(Bill.total_amount)).filter(
+        Bill.customer_id.isnot(None),
+        Bill.payment_status != 'paid'
+    ).scalar() or 0
+    total_payments = db.session.query(db.func.sum(Payment.amount)).scalar() or 0
+    return total_bills - total_payments
+
+# Short-lived per-process cache for read-heavy API payloads, keyed by name and date.
+# Writes that change the underlying data drop the affected keys; the TTL bounds how
+# stale other worker processes can be.
+_payload_cache = {}
+
+def cached_payload(key, ttl_seconds, build):
+    """Return the payload cached under key, rebuilding it once older than ttl_seconds"""
+    now = time.monotonic()
+    entry = _payload_cache.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    payload = build()
+    # Evict expired entries so keys for past dates don't pile up in long-running workers
+    for stale_key, (expires_at, _) in list(_payload_cache.items()):
+        if expires_at <= now:
+            _payload_cache.pop(stale_key, None)
+    _payload_cache[key] = (now + ttl_seconds, payload)
+    return payload
+
+def invalidate_cached_payloads(*prefixes):
+    """Drop cached payloads whose keys start with any of the given prefixes"""
+    for key in list(_payload_cache):
+        if key.startswith(prefixes):
+            _payload_cache.pop(key, None)
 
 # Notification helper functions
 def get_notification_settings():
@@ -290,25 +520,39 @@ def enable_backup():
 def check_low_stock():
     """Check for low stock items and create notifications"""
     try:
-        low_stock_products = Product.query.filter(Product.stock_quantity <= Product.reorder_level).all()
-        for product in low_stock_products:
-            # Check if notification already exists for this product
-            existing = Notification.query.filter_by(
-                type='inventory', 
-                product_id=product.id, 
-                is_read=False
-            ).first()
-            
-            if not existing:
-                create_notification(
-                    f"Low Stock Alert: {product.name}",
-                    f"Only {product.stock_quantity} units left. Reorder level: {product.reorder_level}",
-                    "inventory",
-                    "high",
-                    product_id=product.id
-                )
+        low_stock_products = db.session.query(
+            Product.id, Product.name, Product.stock_quantity, Product.reorder_level
+        ).filter(Product.stock_quantity <= Product.reorder_level).all()
+        if not low_stock_products:
+            return
+        
+        if not get_notification_settings().low_stock_alerts:
+            app.logger.info("Low stock notifications skipped due to user settings")
+            return
+        
+        # Products that already have an unread alert are skipped by the unique index
+        result = db.session.execute(
+            insert_skipping_duplicates(Notification).values([
+                {
+                    'title': f"Low Stock Alert: {product.name}",
+                    'message': f"Only {product.stock_quantity} units left. Reorder level: {product.reorder_level}",
+                    'type': 'inventory',
+                    'priority': 'high',
+                    'is_read': False,
+                    'product_id': product.id
+                }
+                for product in low_stock_products
+            ]).on_conflict_do_nothing(
+                index_elements=['type', 'product_id'],
+                index_where=UNREAD_PRODUCT_NOTIFICATION
+            )
+        )
+        db.session.commit()
+        if result.rowcount:
+            app.logger.info(f"Created {result.rowcount} low stock notifications")
     except Exception as e:
         app.logger.error(f"Error checking low stock: {e}")
+        db.session.rollback()
 
 def check_expiring_products():
     """Check for products expiring soon and create summary notification"""
@@ -349,6 +593,26 @@ def check_expiring_products():
     except Exception as e:
         app.logger.error(f"Error checking expiring products: {e}")
 
+def run_notification_checks():
+    """Run every notification check once; each one skips alerts that already exist"""
+    check_subscription_expiry()
+    check_backup_status()
+    check_low_stock()
+    check_expiring_products()
+
+def notification_check_loop(interval_seconds):
+    """Re-run the notification checks every interval_seconds, off the request path"""
+    while True:
+        time.sleep(interval_seconds)
+        try:
+            with app.app_context():
+                run_notification_checks()
+        except Exception as e:
+            app.logger.error(f"Error running notification checks: {e}")
+
+# Seconds between background notification checks; 0 runs them only at startup
+NOTIFICATION_CHECK_INTERVAL = int(os.environ.get('NOTIFICATION_CHECK_INTERVAL', 300))
+
 # Simplified database initialization - only create tables
 def init_db():
     """Initialize database tables without heavy seeding"""
@@ -358,12 +622,104 @@ def init_db():
     except Exception as e:
         app.logger.error(f"Database initialization error: {e}")
 
+def ensure_extensions():
+    """Enable the PostgreSQL extensions required by the model indexes"""
+    if db.engine.dialect.name == 'postgresql':
+        with db.engine.begin() as conn:
+            conn.execute(db.text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+
+def ensure_columns():
+    """Add model columns that are missing on tables created before they were declared"""
+    inspector = db.inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(db.text(
+                    f'ALTER TABLE {preparer.format_table(table)} '
+                    f'ADD COLUMN {preparer.format_column(column)} {column_type}'
+                ))
+
+def claim_migration(name):
+    """Record a one-time migration in the current transaction; False if it was already applied"""
+    result = db.session.execute(
+        insert_skipping_duplicates(SchemaMigration)
+        .values(name=name, applied_at=utcnow())
+        .on_conflict_do_nothing(index_elements=['name'])
+    )
+    return result.rowcount == 1
+
+def backfill_bill_item_costs():
+    """Copy product cost details onto bill items recorded before they were stored per item"""
+    # Runs once per database: the marker commits with the UPDATE, so a failed run is retried
+    # on the next startup, while items recorded later as matching no product stay NULL
+    if not claim_migration('backfill_bill_item_costs'):
+        db.session.rollback()
+        return
+    
+    matches_item = Product.name == BillItem.item_name
+    
+    def product_value(column):
+        return db.select(column).where(matches_item).order_by(Product.id).limit(1).scalar_subquery()
+    
+    db.session.execute(
+        db.update(BillItem)
+        .where(BillItem.cost_price.is_(None), db.exists().where(matches_item))
+        .values(
+            cost_price=product_value(db.func.coalesce(Product.cost_price, 0)),
+            is_weight_based=product_value(db.func.coalesce(Product.is_weight_based, False))
+        )
+    )
+    db.session.commit()
+
+def backfill_customer_phone_digits():
+    """Fill phone_digits for customers created before it was stored"""
+    customers = db.session.execute(
+        db.select(Customer.id, Customer.phone).where(Customer.phone_digits.is_(None))
+    ).all()
+    if customers:
+        db.session.execute(db.update(Customer), [
+            {'id': customer_id, 'phone_digits': digits_only(phone)} for customer_id, phone in customers
+        ])
+    db.session.commit()
+
+def remove_duplicate_product_notifications():
+    """Delete repeated unread product alerts so the unique notification index can be built"""
+    first_ids = db.select(db.func.min(Notification.id)).where(
+        Notification.is_read == False, Notification.product_id.isnot(None)
+    ).group_by(Notification.type, Notification.product_id)
+    db.session.execute(
+        db.delete(Notification).where(
+            Notification.is_read == False,
+            Notification.product_id.isnot(None),
+            Notification.id.not_in(first_ids)
+        )
+    )
+    db.session.commit()
+
+def insert_skipping_duplicates(model):
+    """INSERT statement for model in the current dialect, for use with on_conflict_do_nothing"""
+    dialect_insert = sqlite.insert if db.engine.dialect.name == 'sqlite' else postgresql.insert
+    return dialect_insert(model)
+
+def ensure_indexes():
+    """Create model indexes that are missing on tables created before they were declared"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
 # Initialize database tables and add sample products
 def ensure_sample_products():
     """Add sample products with real barcodes for scanner functionality"""
     try:
         # Check if products already exist
-        if Product.query.count() > 0:
+        if Product.query.first() is not None:
             return
         
         from datetime import date, timedelta
@@ -427,22 +783,10 @@ def ensure_sample_products():
             }
         ]
         
-        for product_data in sample_products:
-            product = Product(
-                name=product_data['name'],
-                barcode=product_data['barcode'],
-                category=product_data['category'],
-                price=product_data['price'],
-                price_per_kg=product_data.get('price_per_kg'),
-                cost_price=product_data['cost_price'],
-                is_weight_based=product_data['is_weight_based'],
-                stock_quantity=product_data['stock_quantity'],
-                reorder_level=product_data['reorder_level'],
-                expiry_date=product_data['expiry_date']
-            )
-            db.session.add(product)
-        
+        # One multi-row INSERT for all sample products
+        db.session.execute(db.insert(Product), sample_products)
         db.session.commit()
+        invalidate_cached_payloads('products:', 'dash_stats:')
         app.logger.info("Sample products added to database")
         
     except Exception as e:
@@ -456,7 +800,7 @@ def add_sample_sales_data():
         import random
         
         # Check if we already have bills
-        if Bill.query.count() > 0:
+        if Bill.query.first() is not None:
             return
             
         # Get some products for creating bills
@@ -466,6 +810,7 @@ def add_sample_sales_data():
             
         # Create sample bills for different periods
         today = datetime.now()
+        bills = []
         
         # Create bills for the last 30 days
         for days_ago in range(30):
@@ -495,8 +840,6 @@ def add_sample_sales_data():
                     created_at=bill_date,
                     generated_by="Test Data"
                 )
-                db.session.add(bill)
-                db.session.flush()  # Get the bill ID
                 
                 # Add 1-4 items to each bill
                 items_count = random.randint(1, 4)
@@ -508,261 +851,316 @@ def add_sample_sales_data():
                     unit_price = product.price
                     total_price = quantity * unit_price
                     
-                    bill_item = BillItem(
-                        bill_id=bill.id,
+                    bill.items.append(BillItem(
                         item_name=product.name,
                         quantity=quantity,
                         unit_price=unit_price,
                         total_price=total_price,
                         weight=quantity if product.is_weight_based else None,
-                        price_per_kg=product.price_per_kg if product.is_weight_based else None
-                    )
-                    db.session.add(bill_item)
+                        price_per_kg=product.price_per_kg if product.is_weight_based else None,
+                        cost_price=product.cost_price or 0,
+                        is_weight_based=product.is_weight_based
+                    ))
                     bill_total += total_price
                 
                 # Update bill totals
                 bill.subtotal = bill_total
                 bill.total_amount = bill_total
+                bills.append(bill)
         
+        # Insert all bills, then all items, in batched INSERTs on a single flush
+        db.session.add_all(bills)
         db.session.commit()
+        invalidate_cached_payloads('dash_stats:')
         app.logger.info("Sample sales data added for analytics testing")
         
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error adding sample sales data: {e}")
 
+# Under `python app.py` the debug reloader re-runs this module in a child process;
+# the watching parent never serves requests, so it skips database setup
+is_reloader_parent = __name__ == '__main__' and DEBUG and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
 # Initialize database tables once at startup
 try:
-    with app.app_context():
-        db.create_all()
-        ensure_sample_products()
-        add_sample_sales_data()
-        app.logger.info("Database initialized successfully")
+    if not is_reloader_parent:
+        with app.app_context(), without_statement_timeout():
+            ensure_extensions()
+            db.create_all()
+            ensure_columns()
+            # A failed backfill is retried on the next startup; the cost backfill applies only once
+            backfill_bill_item_costs()
+            backfill_customer_phone_digits()
+            remove_duplicate_product_notifications()
+            ensure_indexes()
+            ensure_sample_products()
+            add_sample_sales_data()
+            app.logger.info("Database initialized successfully")
 except Exception as e:
     app.logger.error(f"Database initialization failed: {e}")
 
+def start_background_jobs():
+    """Run the notification checks now and every NOTIFICATION_CHECK_INTERVAL seconds after.
+    
+    Importing this module never starts them; the serving entry point calls this once per
+    process that should run the checks (the __main__ block below, or a server start hook).
+    """
+    if app.testing:
+        return
+    try:
+        with app.app_context():
+            run_notification_checks()
+    except Exception as e:
+        app.logger.error(f"Error running notification checks: {e}")
+    if NOTIFICATION_CHECK_INTERVAL > 0:
+        threading.Thread(
+            target=notification_check_loop, args=(NOTIFICATION_CHECK_INTERVAL,),
+            name='notification-checks', daemon=True
+        ).start()
+
 def ensure_db_initialized():
     # Database is already initialized at startup
     pass
 
+@lru_cache(maxsize=None)
+def render_cached_page(template_name):
+    """Render a context-free page template once and reuse the HTML"""
+    return render_template(template_name)
+
+def render_page(template_name):
+    """Render a static page, from cache unless running in debug mode"""
+    if app.debug:
+        # Keep template edits visible while developing
+        return render_template(template_name)
+    return render_cached_page(template_name)
+
 @app.route('/')
 def index():
     """Serve the Kirana Konnect splash screen"""
     ensure_db_initialized()
-    return render_template('splash.html')
+    return render_page('splash.html')
 
 @app.route('/pricing')
 def pricing():
     """Serve the pricing plans page"""
-    return render_template('index.html')
+    return render_page('index.html')
 
 @app.route('/signup')
 def signup():
     """Serve the signup page"""
-    return render_template('signup.html')
+    return render_page('signup.html')
 
 @app.route('/signin')
 @app.route('/login')
 def signin():
     """Serve the signin page"""
-    return render_template('signin.html')
+    return render_page('signin.html')
 
 @app.route('/dashboard')
 def dashboard():
     """Serve the main dashboard page"""
-    return render_template('dashboard.html')
+    return render_page('dashboard.html')
 
 @app.route('/cart')
 def cart():
     """Serve the cart/billing page"""
-    return render_template('cart.html')
+    return render_page('cart.html')
 
 @app.route('/inventory')
 def inventory():
     """Serve the inventory management page"""
-    return render_template('inventory.html')
+    return render_page('inventory.html')
 
 @app.route('/add-item')
 def add_item():
     """Serve the add new item page"""
-    return render_template('add_item.html')
+    return render_page('add_item.html')
 
 @app.route('/profile')
 def profile():
     """Serve the user profile page"""
-    return render_template('profile.html')
+    return render_page('profile.html')
 
 @app.route('/product-details')
 def product_details():
     """Serve the product details page"""
-    return render_template('product_details.html')
+    return render_page('product_details.html')
 
 @app.route('/product-details-weight')
 def product_details_weight():
     """Serve the weight-based product details page"""
-    return render_template('product_details_weight.html')
+    return render_page('product_details_weight.html')
 
 @app.route('/customer-ledger')
 def customer_ledger():
     """Serve the customer ledger page"""
-    return render_template('customer_ledger.html')
+    return render_page('customer_ledger.html')
 
 @app.route('/notifications')
 def notifications():
     """Serve the notifications page"""
-    return render_template('notifications.html')
+    return render_page('notifications.html')
 
 @app.route('/receipt')
 def receipt():
     """Serve the receipt page"""
-    return render_template('receipt.html')
+    return render_page('receipt.html')
 
 @app.route('/bill-generate')
 def bill_generate():
     """Serve the bill generation page"""
-    return render_template('bill_generate.html')
+    return render_page('bill_generate.html')
 
 @app.route('/low-stock')
 def low_stock():
     """Serve the low stock alert page"""
-    return render_template('low_stock.html')
+    return render_page('low_stock.html')
 
 @app.route('/expiry-alert')
 def expiry_alert():
     """Serve the expiry alert page"""
-    return render_template('expiry_alert.html')
+    return render_page('expiry_alert.html')
 
 @app.route('/pending-credits')
 def pending_credits():
     """Serve the pending credits page"""
-    return render_template('pending_credits.html')
+    return render_page('pending_credits.html')
 
 @app.route('/sales-report')
 def sales_report():
     """Serve the sales report page"""
-    return render_template('sales_report.html')
+    return render_page('sales_report.html')
 
 @app.route('/settings')
 def settings():
     """Serve the settings page"""
-    return render_template('settings.html')
+    return render_page('settings.html')
 
 @app.route('/refill-stock')
 def refill_stock():
     """Serve the refill stock page"""
-    return render_template('refill_stock.html')
+    return render_page('refill_stock.html')
 
 @app.route('/refill-stock-weight')
 def refill_stock_weight():
     """Serve the weight-based refill stock page"""
-    return render_template('refill_stock_weight.html')
+    return render_page('refill_stock_weight.html')
 
 @app.route('/staff')
 def staff():
     """Serve the staff management page"""
-    return render_template('staff.html')
+    return render_page('staff.html')
 
 # API Endpoints for Customer Management and Billing
 
 @app.route('/api/products')
 def get_products():
-    """Get all products for inventory display"""
-    products = Product.query.all()
+    """Get products for inventory display, all at once or a page at a time (?after_id=&limit=)"""
+    today = utcnow().date()
+    after_id = request.args.get('after_id', type=int)
+    limit = request.args.get('limit', type=int)
     
-    results = []
-    for product in products:
-        # Check if product is low stock or expired
-        is_low_stock = product.stock_quantity <= product.reorder_level
-        is_expired = product.expiry_date and product.expiry_date < datetime.utcnow().date()
-        
-        results.append({
-            'id': str(product.id),
-            'name': product.name,
-            'barcode': product.barcode,
-            'category': product.category or 'general',
-            'price': product.price,
-            'price_per_kg': product.price_per_kg,
-            'is_weight_based': product.is_weight_based,
-            'stock_quantity': product.stock_quantity,
-            'reorder_level': product.reorder_level,
-            'expiry_date': product.expiry_date.strftime('%d/%m/%Y') if product.expiry_date else None,
-            'is_low_stock': is_low_stock,
-            'is_expired': is_expired,
-            'unit': 'kg' if product.is_weight_based else 'Piece'
-        })
+    if after_id is None and limit is None:
+        return jsonify(cached_payload(f'products:{today}', 30, lambda: build_products_payload(today)))
+    
+    # Clamp the page size to 1..500 so a zero or negative ?limit= never reaches SQL
+    return jsonify(build_products_payload(today, after_id=after_id or 0, limit=max(1, min(limit or 100, 500))))
+
+def build_products_payload(today, after_id=None, limit=None):
+    """Build the inventory product list, keyset-paginated by id when a limit is given"""
+    query = db.session.query(
+        Product.id, Product.name, Product.barcode, Product.category, Product.price,
+        Product.price_per_kg, Product.is_weight_based, Product.stock_quantity,
+        Product.reorder_level, Product.expiry_date,
+        # Flag low stock and expired products in SQL
+        (Product.stock_quantity <= Product.reorder_level).label('is_low_stock'),
+        (Product.expiry_date < today).label('is_expired')
+    ).order_by(Product.id)
+    if after_id is not None:
+        query = query.filter(Product.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
     
-    return jsonify({'products': results})
+    results = [{
+        'id': str(product.id),
+        'name': product.name,
+        'barcode': product.barcode,
+        'category': product.category or 'general',
+        'price': product.price,
+        'price_per_kg': product.price_per_kg,
+        'is_weight_based': product.is_weight_based,
+        'stock_quantity': product.stock_quantity,
+        'reorder_level': product.reorder_level,
+        'expiry_date': product.expiry_date.strftime('%d/%m/%Y') if product.expiry_date else None,
+        'is_low_stock': product.is_low_stock,
+        'is_expired': product.is_expired,
+        'unit': 'kg' if product.is_weight_based else 'Piece'
+    } for product in query]
+    
+    payload = {'products': results}
+    if limit is not None:
+        # Pass back as after_id to fetch the next page; null on the last page
+        payload['next_after_id'] = int(results[-1]['id']) if len(results) == limit else None
+    return payload
 
 @app.route('/api/dashboard/stats')
 def get_dashboard_stats():
     """Get dashboard statistics including today's profit"""
-    today = datetime.utcnow().date()
+    today = utcnow().date()
+    return jsonify(cached_payload(f'dash_stats:{today}', 10, lambda: build_dashboard_stats(today)))
+
+def build_dashboard_stats(today):
+    """Compute today's sales, profit, credit and inventory figures"""
+    yesterday = today - timedelta(days=1)
+    window_start = datetime.combine(yesterday, datetime.min.time())
+    window_end = datetime.combine(today + timedelta(days=1), datetime.min.time())
+    
+    # Cost of goods sold per item from the cost recorded at sale time (per gram for weighed
+    # items), falling back to 65% of the sale price when no cost price is set
+    item_cost = db.case(
+        (db.and_(BillItem.cost_price > 0, BillItem.is_weight_based,
+                 BillItem.weight.isnot(None), BillItem.weight != 0,
+                 BillItem.price_per_kg.isnot(None), BillItem.price_per_kg != 0),
+         BillItem.cost_price / 1000.0 * BillItem.weight),
+        (BillItem.cost_price > 0, BillItem.cost_price * BillItem.quantity),
+        (BillItem.cost_price.isnot(None), BillItem.unit_price * 0.65 * BillItem.quantity),
+        else_=0
+    )
+    # Items that didn't match a product are left out of revenue and cost
+    item_revenue = db.case((BillItem.cost_price.isnot(None), BillItem.total_price), else_=0)
     
-    # Calculate today's sales
-    today_bills = Bill.query.filter(
-        db.func.date(Bill.created_at) == today,
+    paid_in_window = (
+        Bill.created_at >= window_start,
+        Bill.created_at < window_end,
         Bill.payment_status == 'paid'
-    ).all()
+    )
     
-    total_sales = sum(bill.total_amount for bill in today_bills)
-    transaction_count = len(today_bills)
-    
-    # Calculate actual cost of goods sold based on products sold today
-    actual_cost = 0
-    total_revenue = 0
-    
-    for bill in today_bills:
-        bill_items = BillItem.query.filter_by(bill_id=bill.id).all()
-        for item in bill_items:
-            # Get product cost from database
-            product = Product.query.filter_by(name=item.item_name).first()
-            if product and product.cost_price > 0:
-                # Use actual cost price from database
-                if product.is_weight_based and item.weight:
-                    # For weight-based items, calculate based on weight
-                    item_cost = (product.cost_price / 1000) * item.weight if product.price_per_kg else product.cost_price * item.quantity
-                else:
-                    # For regular items
-                    item_cost = product.cost_price * item.quantity
-                actual_cost += item_cost
-                total_revenue += item.total_price
-            elif product:
-                # Fallback if cost price not set
-                item_cost = item.unit_price * 0.65 * item.quantity
-                actual_cost += item_cost
-                total_revenue += item.total_price
+    # Per-bill item totals, then per-day bill totals, for today and yesterday in one query
+    bill_item_totals = db.session.query(
+        BillItem.bill_id.label('bill_id'),
+        db.func.sum(item_revenue).label('revenue'),
+        db.func.sum(item_cost).label('cost')
+    ).join(Bill, Bill.id == BillItem.bill_id).filter(*paid_in_window).group_by(BillItem.bill_id).subquery()
     
-    today_profit = total_revenue - actual_cost
+    sale_day = db.func.date(Bill.created_at)
+    daily_totals = db.session.query(
+        sale_day,
+        db.func.count(Bill.id),
+        db.func.sum(Bill.total_amount),
+        db.func.sum(bill_item_totals.c.revenue),
+        db.func.sum(bill_item_totals.c.cost)
+    ).outerjoin(
+        bill_item_totals, bill_item_totals.c.bill_id == Bill.id
+    ).filter(*paid_in_window).group_by(sale_day).all()
     
-    # Get yesterday's sales for comparison
-    yesterday = today - timedelta(days=1)
-    yesterday_bills = Bill.query.filter(
-        db.func.date(Bill.created_at) == yesterday,
-        Bill.payment_status == 'paid'
-    ).all()
+    days = {str(day): (count, sales or 0, revenue or 0, cost or 0)
+            for day, count, sales, revenue, cost in daily_totals}
     
-    yesterday_sales = sum(bill.total_amount for bill in yesterday_bills)
-    
-    # Calculate yesterday's actual profit using same method
-    yesterday_cost = 0
-    yesterday_revenue = 0
-    
-    for bill in yesterday_bills:
-        bill_items = BillItem.query.filter_by(bill_id=bill.id).all()
-        for item in bill_items:
-            product = Product.query.filter_by(name=item.item_name).first()
-            if product and product.cost_price > 0:
-                if product.is_weight_based and item.weight:
-                    item_cost = (product.cost_price / 1000) * item.weight if product.price_per_kg else product.cost_price * item.quantity
-                else:
-                    item_cost = product.cost_price * item.quantity
-                yesterday_cost += item_cost
-                yesterday_revenue += item.total_price
-            elif product:
-                item_cost = item.unit_price * 0.65 * item.quantity
-                yesterday_cost += item_cost
-                yesterday_revenue += item.total_price
+    transaction_count, total_sales, total_revenue, actual_cost = days.get(today.isoformat(), (0, 0, 0, 0))
+    today_profit = total_revenue - actual_cost
     
+    _, yesterday_sales, yesterday_revenue, yesterday_cost = days.get(yesterday.isoformat(), (0, 0, 0, 0))
     yesterday_profit = yesterday_revenue - yesterday_cost
     
     # Calculate profit growth
@@ -775,17 +1173,20 @@ def get_dashboard_stats():
         profit_growth = 0    # No change when both are zero
     
     # Get outstanding credit amounts
-    outstanding_customers = Customer.query.all()
-    total_outstanding = sum(customer.outstanding_balance for customer in outstanding_customers)
-    customers_with_credit = len([c for c in outstanding_customers if c.outstanding_balance > 0])
+    outstanding_balances = get_outstanding_balances().values()
+    total_outstanding = sum(outstanding_balances)
+    customers_with_credit = len([balance for balance in outstanding_balances if balance > 0])
     
     # Get inventory stats
-    all_products = Product.query.all()
-    total_products = len(all_products)
-    expired_products = len([p for p in all_products if p.expiry_date and p.expiry_date < today])
-    low_stock_products = len([p for p in all_products if p.stock_quantity <= p.reorder_level])
+    total_products, expired_products, low_stock_products = db.session.query(
+        db.func.count(Product.id),
+        db.func.sum(db.case((Product.expiry_date < today, 1), else_=0)),
+        db.func.sum(db.case((Product.stock_quantity <= Product.reorder_level, 1), else_=0))
+    ).one()
+    expired_products = expired_products or 0
+    low_stock_products = low_stock_products or 0
     
-    return jsonify({
+    return {
         'today_profit': round(today_profit, 2),
         'profit_growth': round(profit_growth, 1),
         'total_sales': round(total_sales, 2),
@@ -797,7 +1198,7 @@ def get_dashboard_stats():
         'total_products': total_products,
         'expired_products': expired_products,
         'low_stock_products': low_stock_products
-    })
+    }
 
 @app.route('/api/customers/search')
 def search_customers():
@@ -807,20 +1208,24 @@ def search_customers():
     if len(query) < 2:
         return jsonify([])
     
-    customers = Customer.query.filter(
-        db.or_(
-            Customer.name.ilike(f'%{query}%'),
-            Customer.phone.ilike(f'%{query}%')
-        )
-    ).limit(10).all()
+    # Only match the column the input can belong to: phones hold no letters, so input with
+    # letters searches names; phone input is compared on digits, ignoring spaces and dashes
+    query_digits = digits_only(query)
+    if any(char.isalpha() for char in query) or not query_digits:
+        search_filter = Customer.name.ilike(f'%{query}%')
+    else:
+        search_filter = Customer.phone_digits.like(f'%{query_digits}%')
+    
+    customers = db.session.execute(
+        db.select(Customer.id, Customer.name, Customer.phone).where(search_filter).limit(10)
+    ).mappings().all()
+    balances = get_outstanding_balances([customer['id'] for customer in customers])
     
     results = []
     for customer in customers:
-        outstanding = customer.outstanding_balance
+        outstanding = balances.get(customer['id'], 0)
         results.append({
-            'id': customer.id,
-            'name': customer.name,
-            'phone': customer.phone,
+            **customer,
             'outstanding': f'₹{outstanding:.0f}' if outstanding > 0 else 'No Outstanding',
             'outstanding_amount': outstanding
         })
@@ -853,9 +1258,9 @@ def create_customer():
             'phone': customer.phone,
             'message': 'Customer created successfully'
         })
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"Error creating customer: {e}")
+        app.logger.exception("Error creating customer")
         return jsonify({'error': 'Failed to create customer'}), 500
 
 @app.route('/api/bills', methods=['POST'])
@@ -863,13 +1268,8 @@ def create_bill():
     """Generate a new bill and save it to database"""
     data = request.get_json()
     
-    # Generate bill number
-    import random
-    bill_number = f"KK-{datetime.now().year}-{random.randint(1000, 9999)}"
-    
-    # Create the bill
+    # Create the bill; its bill number is generated by the INSERT
     bill = Bill(
-        bill_number=bill_number,
         customer_id=data.get('customer_id'),
         customer_name=data.get('customer_name'),
         subtotal=data['subtotal'],
@@ -885,18 +1285,31 @@ def create_bill():
     db.session.add(bill)
     db.session.flush()  # Get the bill ID
     
-    # Add bill items
-    for item_data in data.get('items', []):
-        bill_item = BillItem(
-            bill_id=bill.id,
-            item_name=item_data['name'],
-            quantity=item_data['quantity'],
-            unit_price=item_data['unit_price'],
-            total_price=item_data['total_price'],
-            weight=item_data.get('weight'),
-            price_per_kg=item_data.get('price_per_kg')
-        )
-        db.session.add(bill_item)
+    # Record each item's product cost at time of sale so reports don't depend on the current catalog
+    items = data.get('items', [])
+    products = {
+        product.name: product
+        for product in db.session.query(
+            Product.name, Product.cost_price, Product.is_weight_based
+        ).filter(Product.name.in_({item_data['name'] for item_data in items}))
+    }
+    
+    # Add bill items in a single multi-row INSERT
+    if items:
+        db.session.execute(db.insert(BillItem), [
+            {
+                'bill_id': bill.id,
+                'item_name': item_data['name'],
+                'quantity': item_data['quantity'],
+                'unit_price': item_data['unit_price'],
+                'total_price': item_data['total_price'],
+                'weight': item_data.get('weight'),
+                'price_per_kg': item_data.get('price_per_kg'),
+                'cost_price': (products[item_data['name']].cost_price or 0) if item_data['name'] in products else None,
+                'is_weight_based': bool(products[item_data['name']].is_weight_based) if item_data['name'] in products else False
+            }
+            for item_data in items
+        ])
     
     # If payment is made, create payment record and send SMS
     if data['payment_mode'] != 'credit' and data.get('customer_id'):
@@ -922,6 +1335,7 @@ def create_bill():
             send_credit_purchase_sms(customer.phone, customer.name, data['total_amount'], new_balance)
     
     db.session.commit()
+    invalidate_cached_payloads('dash_stats:')
     
     return jsonify({
         'bill_id': bill.id,
@@ -934,19 +1348,33 @@ def api_customer_ledger(customer_id):
     """Get customer's ledger with bills and payments"""
     customer = Customer.query.get_or_404(customer_id)
     
-    bills = Bill.query.filter_by(customer_id=customer_id).order_by(Bill.created_at.desc()).all()
+    bills = db.session.execute(
+        db.select(Bill.id, Bill.bill_number, Bill.total_amount, Bill.payment_status, Bill.created_at)
+        .where(Bill.customer_id == customer_id)
+        .order_by(Bill.created_at.desc())
+    ).mappings().all()
     payments = Payment.query.filter_by(customer_id=customer_id).order_by(Payment.created_at.desc()).all()
     
+    # Load the items of all these bills in one SELECT instead of one per bill
+    items_by_bill = defaultdict(list)
+    for item in db.session.execute(
+        db.select(BillItem.bill_id, BillItem.item_name, BillItem.quantity, BillItem.total_price)
+        .where(BillItem.bill_id.in_([bill['id'] for bill in bills]))
+        .order_by(BillItem.id)
+    ).mappings():
+        items_by_bill[item['bill_id']].append(
+            {'name': item['item_name'], 'quantity': item['quantity'], 'total': item['total_price']}
+        )
+    
     bill_data = []
     for bill in bills:
         bill_data.append({
-            'id': bill.id,
-            'bill_number': bill.bill_number,
-            'amount': bill.total_amount,
-            'payment_status': bill.payment_status,
-            'created_at': bill.created_at.strftime('%Y-%m-%d %H:%M'),
-            'items': [{'name': item.item_name, 'quantity': item.quantity, 'total': item.total_price} 
-                     for item in bill.items]
+            'id': bill['id'],
+            'bill_number': bill['bill_number'],
+            'amount': bill['total_amount'],
+            'payment_status': bill['payment_status'],
+            'created_at': bill['created_at'].strftime('%Y-%m-%d %H:%M'),
+            'items': items_by_bill[bill['id']]
         })
     
     payment_data = []
@@ -974,13 +1402,11 @@ def api_customer_ledger(customer_id):
 def api_get_bill(bill_number):
     """Get bill details by bill number"""
     try:
-        bill = Bill.query.filter_by(bill_number=bill_number).first()
+        # Load the bill and its items in one query
+        bill = Bill.query.options(joinedload(Bill.items)).filter_by(bill_number=bill_number).first()
         if not bill:
             return jsonify({'success': False, 'error': 'Bill not found'}), 404
         
-        # Get bill items
-        items = BillItem.query.filter_by(bill_id=bill.id).all()
-        
         return jsonify({
             'success': True,
             'bill_number': bill.bill_number,
@@ -992,7 +1418,7 @@ def api_get_bill(bill_number):
             'payment_mode': bill.payment_mode,
             'payment_status': bill.payment_status,
             'generated_by': bill.generated_by,
-            'created_at': bill.created_at.isoformat(),
+            'created_at': bill.created_at,
             'include_dates': bill.include_dates,
             'items': [{
                 'item_name': item.item_name,
@@ -1001,7 +1427,7 @@ def api_get_bill(bill_number):
                 'total_price': item.total_price,
                 'weight': item.weight,
                 'price_per_kg': item.price_per_kg
-            } for item in items]
+            } for item in bill.items]
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1010,7 +1436,8 @@ def api_get_bill(bill_number):
 def create_payment():
     """Record a payment for a customer"""
     try:
-        data = request.get_json()
+        # A missing or malformed JSON body falls through to the 400 below
+        data = request.get_json(silent=True) or {}
         
         customer_id = data.get('customer_id')
         amount = data.get('amount')
@@ -1021,6 +1448,14 @@ def create_payment():
         if not customer_id or not amount:
             return jsonify({'error': 'Customer ID and amount are required'}), 400
         
+        # Reject NaN/inf as well as zero or negative amounts; they would poison every balance SUM
+        try:
+            amount = float(amount)
+        except (TypeError, ValueError):
+            amount = None
+        if amount is None or not math.isfinite(amount) or amount <= 0:
+            return jsonify({'error': 'Amount must be a positive number'}), 400
+        
         # Create new payment record
         payment = Payment(
             customer_id=customer_id,
@@ -1028,11 +1463,14 @@ def create_payment():
             payment_mode=payment_mode,
             reference_number=reference_number,
             notes=notes,
-            created_at=datetime.utcnow()
+            created_at=utcnow()
         )
         
         db.session.add(payment)
+        db.session.flush()
+        payment_id = payment.id  # read before commit expires the object
         db.session.commit()
+        invalidate_cached_payloads('dash_stats:')
         
         # Send credit payment SMS if enabled
         customer = Customer.query.get(customer_id)
@@ -1040,7 +1478,7 @@ def create_payment():
             remaining_balance = customer.outstanding_balance() - amount
             send_credit_payment_sms(customer.phone, customer.name, amount, remaining_balance)
         
-        return jsonify({'message': 'Payment recorded successfully', 'payment_id': payment.id}), 201
+        return jsonify({'message': 'Payment recorded successfully', 'payment_id': payment_id}), 201
         
     except Exception as e:
         logging.error(f"Error creating payment: {str(e)}")
@@ -1053,34 +1491,23 @@ def get_notifications():
         # Initialize database tables if needed
         ensure_db_initialized()
         
-        # Run notification checks to ensure latest data
-        try:
-            check_subscription_expiry()
-            check_backup_status()
-            check_low_stock()
-            check_expiring_products()
-        except Exception as check_error:
-            app.logger.warning(f"Error running notification checks: {check_error}")
-        
-        # Fetch all unread notifications, ordered by priority and creation time
-        notifications = Notification.query.filter_by(is_read=False).order_by(
-            Notification.created_at.desc()
-        ).all()
+        # Fetch all unread notifications, ordered by priority and creation time; the checks
+        # that create them run in a background thread, not on this request
+        notifications = db.session.execute(
+            db.select(
+                Notification.id, Notification.title, Notification.message,
+                Notification.type, Notification.priority, Notification.created_at
+            )
+            .where(Notification.is_read == False)
+            .order_by(Notification.created_at.desc())
+        ).mappings()
         
         notification_data = []
         for notif in notifications:
             try:
-                notification_data.append({
-                    'id': notif.id,
-                    'title': notif.title,
-                    'message': notif.message,
-                    'type': notif.type,
-                    'priority': notif.priority,
-                    'created_at': notif.created_at.isoformat(),
-                    'time_ago': get_time_ago(notif.created_at)
-                })
+                notification_data.append({**notif, 'time_ago': get_time_ago(notif['created_at'])})
             except Exception as item_error:
-                app.logger.warning(f"Error processing notification {notif.id}: {item_error}")
+                app.logger.warning(f"Error processing notification {notif['id']}: {item_error}")
                 continue
         
         return jsonify({
@@ -1185,7 +1612,7 @@ def update_notification_settings_api():
         if 'subscription_alerts' in data:
             settings.subscription_alerts = data['subscription_alerts']
             
-        settings.updated_at = datetime.utcnow()
+        settings.updated_at = utcnow()
         db.session.commit()
         
         return jsonify({'message': 'Settings updated successfully'})
@@ -1303,16 +1730,16 @@ def send_payment_reminder_sms(customer_phone, customer_name, amount):
 
 def get_time_ago(datetime_obj):
     """Calculate human-readable time difference"""
-    now = datetime.utcnow()
-    diff = now - datetime_obj
+    seconds = int((utcnow() - datetime_obj).total_seconds())
     
-    if diff.days > 0:
-        return f"{diff.days} day{'s' if diff.days != 1 else ''} ago"
-    elif diff.seconds > 3600:
-        hours = diff.seconds // 3600
+    if seconds >= 86400:
+        days = seconds // 86400
+        return f"{days} day{'s' if days != 1 else ''} ago"
+    elif seconds > 3600:
+        hours = seconds // 3600
         return f"{hours} hour{'s' if hours != 1 else ''} ago"
-    elif diff.seconds > 60:
-        minutes = diff.seconds // 60
+    elif seconds > 60:
+        minutes = seconds // 60
         return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
     else:
         return "Just now"
@@ -1324,36 +1751,26 @@ def api_sales_data():
         period = request.args.get('period', 'weekly')  # daily, weekly, monthly
         from datetime import datetime, timedelta
         
-        # Calculate date range based on period
+        # Calculate date range based on period, as a half-open [from, to) range of whole days
         today = datetime.now()
-        if period == 'daily':
-            from_datetime = today.replace(hour=0, minute=0, second=0, microsecond=0)
-            to_datetime = today.replace(hour=23, minute=59, second=59, microsecond=999999)
-        elif period == 'weekly':
-            from_datetime = today - timedelta(days=6)
-            from_datetime = from_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
-            to_datetime = today.replace(hour=23, minute=59, second=59, microsecond=999999)
-        elif period == 'monthly':
-            from_datetime = today - timedelta(days=29)
-            from_datetime = from_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
-            to_datetime = today.replace(hour=23, minute=59, second=59, microsecond=999999)
-        else:
-            # Default to weekly
-            from_datetime = today - timedelta(days=6)
-            from_datetime = from_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
-            to_datetime = today.replace(hour=23, minute=59, second=59, microsecond=999999)
+        days_back = {'daily': 0, 'weekly': 6, 'monthly': 29}.get(period, 6)  # Default to weekly
+        midnight = today.replace(hour=0, minute=0, second=0, microsecond=0)
+        from_datetime = midnight - timedelta(days=days_back)
+        to_datetime = midnight + timedelta(days=1)
         
-        # Build query for the period
-        query = Bill.query.filter(
+        # Paid bills for the period, read as plain rows
+        paid_in_period = (
             Bill.payment_status == 'paid',
             Bill.created_at >= from_datetime,
-            Bill.created_at <= to_datetime
+            Bill.created_at < to_datetime
         )
-        
-        bills = query.all()
+        bills = db.session.execute(
+            db.select(Bill.id, Bill.total_amount, Bill.payment_mode, Bill.created_at)
+            .where(*paid_in_period)
+        ).mappings().all()
         
         # Calculate statistics
-        total_revenue = sum(bill.total_amount for bill in bills)
+        total_revenue = sum(bill['total_amount'] for bill in bills)
         total_bills = len(bills)
         total_profit = 0
         
@@ -1365,15 +1782,15 @@ def api_sales_data():
         }
         
         for bill in bills:
-            mode = bill.payment_mode.lower()
+            mode = bill['payment_mode'].lower()
             if mode in ['cash']:
-                payment_modes['cash']['amount'] += bill.total_amount
+                payment_modes['cash']['amount'] += bill['total_amount']
                 payment_modes['cash']['count'] += 1
             elif mode in ['online', 'upi', 'card']:
-                payment_modes['online']['amount'] += bill.total_amount
+                payment_modes['online']['amount'] += bill['total_amount']
                 payment_modes['online']['count'] += 1
             elif mode in ['credit']:
-                payment_modes['credit']['amount'] += bill.total_amount
+                payment_modes['credit']['amount'] += bill['total_amount']
                 payment_modes['credit']['count'] += 1
         
         # Category performance and top selling items with investment tracking
@@ -1382,71 +1799,82 @@ def api_sales_data():
         total_investment = 0
         daily_data = []
         
-        # Pre-fetch all products to avoid repeated queries
-        all_products = {p.name.lower(): p for p in Product.query.all()}
+        # Pre-fetch all products and the period's bill items to avoid per-bill queries
+        product_rows = db.session.execute(
+            db.select(Product.id, Product.name, Product.category, Product.cost_price, Product.stock_quantity)
+            .order_by(Product.id)
+        ).mappings().all()
+        all_products = {p['name'].lower(): p for p in product_rows}
+        
+        items_by_bill = defaultdict(list)
+        for item in db.session.execute(
+            db.select(BillItem.bill_id, BillItem.item_name, BillItem.quantity, BillItem.total_price)
+            .join(Bill, Bill.id == BillItem.bill_id)
+            .where(*paid_in_period)
+            .order_by(BillItem.id)
+        ).mappings():
+            items_by_bill[item['bill_id']].append(item)
         
         for bill in bills:
-            bill_items = BillItem.query.filter_by(bill_id=bill.id).all()
+            bill_items = items_by_bill[bill['id']]
             bill_investment = 0
             bill_profit = 0
             
             for item in bill_items:
                 # Quick lookup for exact match
-                product = all_products.get(item.item_name.lower())
+                product = all_products.get(item['item_name'].lower())
                 
                 # If no exact match, try partial matching
                 if not product:
                     for product_name, p in all_products.items():
-                        if item.item_name.lower() in product_name or product_name in item.item_name.lower():
+                        if item['item_name'].lower() in product_name or product_name in item['item_name'].lower():
                             product = p
                             break
                 
                 if product:
                     # Calculate investment and profit for this item
-                    item_investment = (product.cost_price or 0) * item.quantity
-                    item_profit = item.total_price - item_investment
+                    item_investment = (product['cost_price'] or 0) * item['quantity']
+                    item_profit = item['total_price'] - item_investment
                     
                     bill_investment += item_investment
                     bill_profit += item_profit
                     
                     # Category performance
-                    category = product.category or 'Others'
+                    category = product['category'] or 'Others'
                     if category not in category_performance:
                         category_performance[category] = {'amount': 0, 'items': 0, 'investment': 0, 'profit': 0}
-                    category_performance[category]['amount'] += item.total_price
+                    category_performance[category]['amount'] += item['total_price']
                     category_performance[category]['items'] += 1
                     category_performance[category]['investment'] += item_investment
                     category_performance[category]['profit'] += item_profit
                     
                     # Top selling items
-                    item_name = item.item_name
+                    item_name = item['item_name']
                     if item_name not in top_selling_items:
                         top_selling_items[item_name] = {
                             'amount': 0, 
                             'quantity': 0, 
                             'investment': 0, 
                             'profit': 0,
-                            'product_id': product.id
+                            'product_id': product['id']
                         }
-                    top_selling_items[item_name]['amount'] += item.total_price
-                    top_selling_items[item_name]['quantity'] += item.quantity
+                    top_selling_items[item_name]['amount'] += item['total_price']
+                    top_selling_items[item_name]['quantity'] += item['quantity']
                     top_selling_items[item_name]['investment'] += item_investment
                     top_selling_items[item_name]['profit'] += item_profit
             
             # Add daily data for chart
             daily_data.append({
-                'date': bill.created_at.strftime('%Y-%m-%d'),
+                'date': bill['created_at'].strftime('%Y-%m-%d'),
                 'investment': bill_investment,
                 'profit': bill_profit,
-                'revenue': bill.total_amount
+                'revenue': bill['total_amount']
             })
             
             total_investment += bill_investment
             total_profit += bill_profit
         
         # Generate chart data based on period
-        from collections import defaultdict
-        
         # Generate chart dates based on period
         chart_dates = []
         if period == 'daily':
@@ -1503,54 +1931,60 @@ def api_sales_data():
         sorted_items = sorted(top_selling_items.items(), key=lambda x: x[1]['amount'], reverse=True)
         top_items = [{'name': item[0], 'amount': item[1]['amount'], 'quantity': item[1]['quantity'], 'investment': item[1]['investment'], 'profit': item[1]['profit'], 'product_id': item[1]['product_id']} for item in sorted_items[:5]]
         
-        # Recent sales (last 10)
-        recent_bills = Bill.query.order_by(Bill.created_at.desc()).limit(10).all()
+        # Recent sales (last 10), with account customers' names joined in
+        recent_bills = db.session.execute(
+            db.select(
+                Bill.bill_number, Bill.customer_name, Bill.total_amount, Bill.payment_mode,
+                Bill.payment_status, Bill.created_at, Customer.name.label('account_name')
+            )
+            .outerjoin(Customer, Customer.id == Bill.customer_id)
+            .order_by(Bill.created_at.desc())
+            .limit(10)
+        ).mappings()
         recent_sales = []
         
         for bill in recent_bills:
-            customer_name = bill.customer_name if bill.customer_name else "Walk-in Customer"
-            if bill.customer_id:
-                customer = Customer.query.get(bill.customer_id)
-                if customer:
-                    customer_name = customer.name
+            customer_name = bill['account_name'] or bill['customer_name'] or "Walk-in Customer"
             
             recent_sales.append({
-                'bill_number': bill.bill_number,
+                'bill_number': bill['bill_number'],
                 'customer_name': customer_name,
-                'amount': bill.total_amount,
-                'payment_mode': bill.payment_mode,
-                'payment_status': bill.payment_status,
-                'created_at': bill.created_at.strftime('%Y-%m-%d %H:%M:%S')
+                'amount': bill['total_amount'],
+                'payment_mode': bill['payment_mode'],
+                'payment_status': bill['payment_status'],
+                'created_at': bill['created_at'].strftime('%Y-%m-%d %H:%M:%S')
             })
         
         # Calculate dynamic total combined investment 
         # This includes: 1) Initial inventory, 2) Refilling of existing products, 3) New products added
         total_combined_investment = 0
-        products = Product.query.all()
         
-        for product in products:
-            if product.cost_price:
+        for product in product_rows:
+            if product['cost_price']:
                 # Current stock represents total investment:
                 # - Initial stock when product was first added
                 # - All refilling amounts added over time
                 # - Any new products added to inventory
-                current_stock = product.stock_quantity or 0
-                total_product_investment = product.cost_price * current_stock
+                current_stock = product['stock_quantity'] or 0
+                total_product_investment = product['cost_price'] * current_stock
                 total_combined_investment += total_product_investment
         
         # Calculate period-specific sold amount (changes with daily/weekly/monthly)
         period_sold_amount = 0
+        products_by_name = {}
+        for product in product_rows:
+            products_by_name.setdefault(product['name'], product)
         for bill in bills:
-            bill_items = BillItem.query.filter_by(bill_id=bill.id).all()
-            for item in bill_items:
-                # Find matching product to get cost price
-                product = Product.query.filter_by(name=item.item_name).first()
+            for item in items_by_bill[bill['id']]:
+                # Find matching product to get cost price: exact name, else a name containing it
+                product = products_by_name.get(item['item_name'])
                 if not product:
-                    product = Product.query.filter(Product.name.ilike(f'%{item.item_name}%')).first()
+                    item_name = item['item_name'].lower()
+                    product = next((p for p in product_rows if item_name in p['name'].lower()), None)
                 
-                if product and product.cost_price:
+                if product and product['cost_price']:
                     # Add cost price of sold quantity for this period
-                    period_sold_amount += (product.cost_price * item.quantity)
+                    period_sold_amount += (product['cost_price'] * item['quantity'])
 
         # Calculate remaining investment (simplified calculation)
         remaining_investment = max(0, total_combined_investment - period_sold_amount)
@@ -1584,317 +2018,430 @@ def api_sales_data():
         app.logger.error(f"Error fetching sales data: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# PDF export styles, built once at import and shared by every export
+_STYLES = getSampleStyleSheet()
+
+# Clean section heading
+_HEADING_STYLE = ParagraphStyle(
+    'SectionHeading',
+    parent=_STYLES['Heading3'],
+    fontSize=12,
+    spaceAfter=10,
+    spaceBefore=20,
+    textColor=colors.HexColor('#1f2937'),
+    fontName='Helvetica-Bold',
+    backColor=colors.HexColor('#f8fafc'),
+    borderWidth=1,
+    borderColor=colors.HexColor('#e2e8f0'),
+    leftIndent=10,
+    rightIndent=10,
+    topPadding=6,
+    bottomPadding=6
+)
+
+# Normal text style
+_NORMAL_STYLE = ParagraphStyle(
+    'Normal',
+    parent=_STYLES['Normal'],
+    fontSize=10,
+    textColor=colors.HexColor('#374151'),
+    fontName='Helvetica'
+)
+
+# Simple summary style
+_SUMMARY_STYLE = ParagraphStyle(
+    'Summary',
+    parent=_STYLES['Normal'],
+    fontSize=9,
+    textColor=colors.HexColor('#6b7280'),
+    fontName='Helvetica',
+    alignment=1
+)
+
+_HEADER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#2563eb')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
+    ('FONTNAME', (0, 0), (0, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (0, 0), 16),
+    ('FONTNAME', (1, 0), (1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (1, 0), (1, 0), 14),
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, 1), 10),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('LEFTPADDING', (0, 0), (-1, -1), 15),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 15)
+])
+
+_SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.white),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('LEFTPADDING', (0, 0), (-1, -1), 12),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 12)
+])
+
+# Shared by the products, sales and customers tables
+_DATA_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2563eb')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('TOPPADDING', (0, 0), (-1, 0), 8),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6)
+])
+
+_FOOTER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8fafc')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#374151')),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, 1), 8),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('LEFTPADDING', (0, 0), (-1, -1), 15),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 15),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e5e7eb'))
+])
+
+def build_business_report(pdf_file, generated_at):
+    """Write the business data PDF report, stamped with generated_at, into the given file object"""
+    generated_date = format_ddmmyyyy(generated_at)
+    
+    # Always zlib-compress page streams, whatever the global rl_config default
+    doc = SimpleDocTemplate(pdf_file, pagesize=A4, rightMargin=0.75*inch, leftMargin=0.75*inch,
+                          topMargin=0.75*inch, bottomMargin=0.75*inch, pageCompression=1)
+    
+    # Story list to hold all content
+    story = []
+    
+    # Professional Header with branding
+    header_table = Table([
+        ['🏪 KIRANA KONNECT', 'Business Report'],
+        ['Your Store Management Solution', f'Generated: {generated_date}']
+    ], colWidths=[3*inch, 3*inch])
+    header_table.setStyle(_HEADER_TABLE_STYLE)
+    story.append(header_table)
+    story.append(Spacer(1, 25))
+    
+    # Calculate summary metrics in SQL and fetch only the rows shown in the report tables;
+    # sections whose count is zero skip their row query entirely
+    total_products, total_investment = db.session.query(
+        db.func.count(Product.id),
+        db.func.coalesce(db.func.sum(Product.price * Product.stock_quantity), 0)
+    ).one()
+    products = db.session.execute(
+        db.select(Product.name, Product.price, Product.stock_quantity).order_by(Product.id).limit(20)
+    ).all() if total_products else []
+    
+    total_bills, total_sales = db.session.query(
+        db.func.count(Bill.id),
+        db.func.coalesce(db.func.sum(Bill.total_amount), 0)
+    ).one()
+    bills = db.session.execute(
+        db.select(Bill.bill_number, Bill.customer_name, Bill.total_amount, Bill.created_at)
+        .order_by(Bill.created_at.desc()).limit(15)
+    ).all() if total_bills else []
+    
+    total_customers = db.session.query(db.func.count(Customer.id)).scalar()
+    customers = db.session.execute(
+        db.select(Customer.id, Customer.name, Customer.phone).order_by(Customer.id).limit(15)
+    ).all() if total_customers else []
+    
+    # Outstanding total in SQL; per-customer balances only for the customers listed
+    total_outstanding = get_total_outstanding()
+    outstanding_balances = get_outstanding_balances([customer.id for customer in customers]) if customers else {}
+    
+    # Simple Business Summary
+    story.append(Paragraph("BUSINESS SUMMARY", _HEADING_STYLE))
+    
+    summary_data = [
+        ['Total Products in Store', str(total_products)],
+        ['Money Invested', f'₹{total_investment:,.0f}'],
+        ['Total Sales Made', f'₹{total_sales:,.0f}'],
+        ['Number of Customers', str(total_customers)],
+        ['Money to Collect', f'₹{total_outstanding:,.0f}']
+    ]
+    
+    summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
+    summary_table.setStyle(_SUMMARY_TABLE_STYLE)
+    
+    story.append(summary_table)
+    story.append(Spacer(1, 20))
+    
+    # 1. INVENTORY DATA
+    story.append(Paragraph("MY PRODUCTS", _HEADING_STYLE))
+    
+    if products:
+        inventory_data = [['Product Name', 'Buy Price', 'Sell Price', 'Stock']]
+    
+        for product in products:  # Show only first 20 products for simplicity
+            product_name = product.name[:25] + '...' if len(product.name) > 25 else product.name
+            buy_price = product.price if product.price else 0
+            sell_price = product.price if product.price else 0
+    
+            inventory_data.append([
+                product_name,
+                f"₹{buy_price:.0f}",
+                f"₹{sell_price:.0f}",
+                str(product.stock_quantity)
+            ])
+    
+        inventory_table = Table(inventory_data, colWidths=[3*inch, 1.2*inch, 1.2*inch, 1*inch])
+        inventory_table.setStyle(_DATA_TABLE_STYLE)
+        story.append(inventory_table)
+    
+        if total_products > 20:
+            story.append(Paragraph(f"Showing 20 out of {total_products} products", _SUMMARY_STYLE))
+    else:
+        story.append(Paragraph("No products found", _NORMAL_STYLE))
+    
+    story.append(PageBreak())
+    
+    # 2. SALES DATA
+    story.append(Paragraph("MY SALES", _HEADING_STYLE))
+    
+    if bills:
+        bills_data = [['Bill Number', 'Customer', 'Amount', 'Date']]
+    
+        for bill in bills:  # Show only recent 15 bills
+            customer_name = bill.customer_name or 'Cash Sale'
+            if len(customer_name) > 20:
+                customer_name = customer_name[:17] + '...'
+    
+            bills_data.append([
+                bill.bill_number,
+                customer_name,
+                f"₹{bill.total_amount:,.0f}",
+                format_ddmmyyyy(bill.created_at)
+            ])
+    
+        bills_table = Table(bills_data, colWidths=[1.8*inch, 2*inch, 1.2*inch, 1.4*inch])
+        bills_table.setStyle(_DATA_TABLE_STYLE)
+        story.append(bills_table)
+    
+        if total_bills > 15:
+            story.append(Paragraph(f"Showing recent 15 out of {total_bills} total sales", _SUMMARY_STYLE))
+    
+        story.append(Spacer(1, 15))
+        story.append(Paragraph(f"Total Sales Made: ₹{total_sales:,.0f}", _NORMAL_STYLE))
+    else:
+        story.append(Paragraph("No sales found", _NORMAL_STYLE))
+    
+    story.append(PageBreak())
+    
+    # 3. MY CUSTOMERS
+    story.append(Paragraph("MY CUSTOMERS", _HEADING_STYLE))
+    
+    if customers:
+        customer_data = [['Customer Name', 'Phone', 'Money to Collect']]
+    
+        for customer in customers:  # Show only first 15 customers
+            outstanding = outstanding_balances.get(customer.id, 0)
+            customer_name = customer.name[:25] + '...' if len(customer.name) > 25 else customer.name
+    
+            customer_data.append([
+                customer_name,
+                customer.phone,
+                f"₹{outstanding:,.0f}" if outstanding > 0 else "Paid"
+            ])
+    
+        customer_table = Table(customer_data, colWidths=[2.5*inch, 1.8*inch, 1.5*inch])
+        customer_table.setStyle(_DATA_TABLE_STYLE)
+        story.append(customer_table)
+    
+        if total_customers > 15:
+            story.append(Paragraph(f"Showing 15 out of {total_customers} customers", _SUMMARY_STYLE))
+    
+        story.append(Spacer(1, 15))
+        story.append(Paragraph(f"Total Money to Collect: ₹{total_outstanding:,.0f}", _NORMAL_STYLE))
+    else:
+        story.append(Paragraph("No customers found", _NORMAL_STYLE))
+    
+    # Add branded footer
+    story.append(Spacer(1, 50))
+    
+    # Footer with company branding
+    footer_table = Table([
+        ['Thank you for using Kirana Konnect', 'Report End'],
+        ['© 2024 Kirana Konnect Inc.', f'Page Generated: {generated_date}']
+    ], colWidths=[3*inch, 3*inch])
+    footer_table.setStyle(_FOOTER_TABLE_STYLE)
+    story.append(footer_table)
+    
+    # Build PDF
+    doc.build(story)
+
+def export_download_name(generated_at):
+    """Download filename for a business export, stamped with its generation time"""
+    return f'kirana_business_data_{generated_at.strftime("%Y%m%d_%H%M")}.pdf'
+
 @app.route('/export-business-data')
 def export_business_data():
     """Export comprehensive business data as PDF"""
     try:
-        # Create PDF buffer
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=0.75*inch, leftMargin=0.75*inch,
-                              topMargin=0.75*inch, bottomMargin=0.75*inch)
-        
-        # Define simple, clean styles
-        styles = getSampleStyleSheet()
-        
-        # Company header style with logo placeholder
-        company_style = ParagraphStyle(
-            'CompanyHeader',
-            parent=styles['Title'],
-            fontSize=20,
-            spaceAfter=5,
-            alignment=1,
-            textColor=colors.HexColor('#2563eb'),
-            fontName='Helvetica-Bold'
-        )
-        
-        # Simple title style
-        title_style = ParagraphStyle(
-            'ReportTitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=15,
-            alignment=1,
-            textColor=colors.HexColor('#1f2937'),
-            fontName='Helvetica'
-        )
-        
-        # Clean section heading
-        heading_style = ParagraphStyle(
-            'SectionHeading',
-            parent=styles['Heading3'],
-            fontSize=12,
-            spaceAfter=10,
-            spaceBefore=20,
-            textColor=colors.HexColor('#1f2937'),
-            fontName='Helvetica-Bold',
-            backColor=colors.HexColor('#f8fafc'),
-            borderWidth=1,
-            borderColor=colors.HexColor('#e2e8f0'),
-            leftIndent=10,
-            rightIndent=10,
-            topPadding=6,
-            bottomPadding=6
-        )
+        # Build the PDF into a temporary file so it is streamed from disk, not held in memory;
+        # the file is deleted when the response closes it
+        # One timestamp per export so the header, footer and filename always agree
+        generated_at = datetime.now()
+        pdf_file = tempfile.TemporaryFile()
+        build_business_report(pdf_file, generated_at)
+        pdf_file.seek(0)
         
-        # Normal text style
-        normal_style = ParagraphStyle(
-            'Normal',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#374151'),
-            fontName='Helvetica'
-        )
-        
-        # Simple summary style
-        summary_style = ParagraphStyle(
-            'Summary',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.HexColor('#6b7280'),
-            fontName='Helvetica',
-            alignment=1
+        return send_file(
+            pdf_file,
+            as_attachment=True,
+            download_name=export_download_name(generated_at),
+            mimetype='application/pdf'
         )
         
-        # Story list to hold all content
-        story = []
-        
-        # Professional Header with branding
-        header_table = Table([
-            ['🏪 KIRANA KONNECT', 'Business Report'],
-            ['Your Store Management Solution', f'Generated: {datetime.now().strftime("%d-%m-%Y")}']
-        ], colWidths=[3*inch, 3*inch])
-        header_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#2563eb')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
-            ('FONTNAME', (0, 0), (0, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (0, 0), 16),
-            ('FONTNAME', (1, 0), (1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (1, 0), (1, 0), 14),
-            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, 1), 10),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('LEFTPADDING', (0, 0), (-1, -1), 15),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 15)
-        ]))
-        story.append(header_table)
-        story.append(Spacer(1, 25))
-        
-        # Calculate summary metrics first
-        products = Product.query.all()
-        bills = Bill.query.all()
-        customers = Customer.query.all()
-        payments = Payment.query.all()
-        
-        total_products = len(products)
-        total_investment = sum([(p.price * p.stock_quantity) for p in products if p.price])
-        total_sales = sum([b.total_amount for b in bills])
-        total_customers = len(customers)
-        total_outstanding = sum([c.outstanding_balance for c in customers])
-        
-        # Simple Business Summary
-        story.append(Paragraph("BUSINESS SUMMARY", heading_style))
-        
-        summary_data = [
-            ['Total Products in Store', str(total_products)],
-            ['Money Invested', f'₹{total_investment:,.0f}'],
-            ['Total Sales Made', f'₹{total_sales:,.0f}'],
-            ['Number of Customers', str(total_customers)],
-            ['Money to Collect', f'₹{total_outstanding:,.0f}']
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.white),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('LEFTPADDING', (0, 0), (-1, -1), 12),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 12)
-        ]))
-        
-        story.append(summary_table)
-        story.append(Spacer(1, 20))
-        
-        # 1. INVENTORY DATA
-        story.append(Paragraph("MY PRODUCTS", heading_style))
-        
-        if products:
-            inventory_data = [['Product Name', 'Buy Price', 'Sell Price', 'Stock']]
-            
-            for product in products[:20]:  # Show only first 20 products for simplicity
-                product_name = product.name[:25] + '...' if len(product.name) > 25 else product.name
-                buy_price = product.price if product.price else 0
-                sell_price = product.price if product.price else 0
-                
-                inventory_data.append([
-                    product_name,
-                    f"₹{buy_price:.0f}",
-                    f"₹{sell_price:.0f}",
-                    str(product.stock_quantity)
-                ])
-            
-            inventory_table = Table(inventory_data, colWidths=[3*inch, 1.2*inch, 1.2*inch, 1*inch])
-            inventory_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2563eb')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('TOPPADDING', (0, 0), (-1, 0), 8),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('TOPPADDING', (0, 1), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6)
-            ]))
-            story.append(inventory_table)
-            
-            if len(products) > 20:
-                story.append(Paragraph(f"Showing 20 out of {len(products)} products", summary_style))
-        else:
-            story.append(Paragraph("No products found", normal_style))
-        
-        story.append(PageBreak())
-        
-        # 2. SALES DATA
-        story.append(Paragraph("MY SALES", heading_style))
-        
-        if bills:
-            bills_data = [['Bill Number', 'Customer', 'Amount', 'Date']]
-            
-            for bill in bills[:15]:  # Show only recent 15 bills
-                customer_name = bill.customer_name or 'Cash Sale'
-                if len(customer_name) > 20:
-                    customer_name = customer_name[:17] + '...'
-                
-                bills_data.append([
-                    bill.bill_number,
-                    customer_name,
-                    f"₹{bill.total_amount:,.0f}",
-                    bill.created_at.strftime('%d-%m-%Y')
-                ])
-            
-            bills_table = Table(bills_data, colWidths=[1.8*inch, 2*inch, 1.2*inch, 1.4*inch])
-            bills_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2563eb')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('TOPPADDING', (0, 0), (-1, 0), 8),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('TOPPADDING', (0, 1), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6)
-            ]))
-            story.append(bills_table)
-            
-            if len(bills) > 15:
-                story.append(Paragraph(f"Showing recent 15 out of {len(bills)} total sales", summary_style))
-                
-            story.append(Spacer(1, 15))
-            story.append(Paragraph(f"Total Sales Made: ₹{sum([b.total_amount for b in bills]):,.0f}", normal_style))
-        else:
-            story.append(Paragraph("No sales found", normal_style))
-        
-        story.append(PageBreak())
+    except Exception as e:
+        logging.error(f"Error generating business data export: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to generate export'}), 500
+
+# Background business exports. Job state lives in the local temp dir so any worker process
+# on the same host can serve it: <job_id>.queued until a worker picks the job up,
+# <job_id>.pdf.part while building, <job_id>.pdf plus its <job_id>.generated_at stamp when
+# ready, <job_id>.error on failure. It is not shared between hosts, so a poll routed to
+# another instance gets a 404 and the page falls back to the synchronous GET export.
+# Waiting in the queue and building are each limited to EXPORT_JOB_TIMEOUT seconds: a job
+# still queued past it is abandoned, and a build past it belongs to a worker that died.
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), 'kirana_exports')
+EXPORT_JOB_TIMEOUT = int(os.environ.get('EXPORT_JOB_TIMEOUT', 600))
+export_executor = ThreadPoolExecutor(max_workers=2)
+
+def export_job_path(job_id, suffix):
+    """Get the on-disk path for a background export job file"""
+    return os.path.join(EXPORT_DIR, f'{job_id}{suffix}')
+
+def prune_export_jobs(max_age_seconds=3600):
+    """Remove export files left behind by jobs that were never downloaded"""
+    cutoff = time.time() - max_age_seconds
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+def export_job_age(path):
+    """Seconds since the job file at path was last touched, or None if it doesn't exist"""
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+def run_business_export_job(job_id):
+    """Build a business export PDF in the background and publish it under its job id"""
+    part_path = export_job_path(job_id, '.pdf.part')
+    try:
+        # Claim the job: touching the marker starts the build clock, and a marker already
+        # removed by a status poll means the job timed out in the queue and is skipped
+        try:
+            os.utime(export_job_path(job_id, '.queued'))
+            os.replace(export_job_path(job_id, '.queued'), part_path)
+        except FileNotFoundError:
+            return
         
-        # 3. MY CUSTOMERS
-        story.append(Paragraph("MY CUSTOMERS", heading_style))
+        generated_at = datetime.now()
+        with app.app_context(), without_statement_timeout():
+            with open(part_path, 'wb') as pdf_file:
+                build_business_report(pdf_file, generated_at)
+        # Keep the report's timestamp beside the PDF so the download name matches its header
+        with open(export_job_path(job_id, '.generated_at'), 'w') as stamp_file:
+            stamp_file.write(generated_at.isoformat())
+        os.replace(part_path, export_job_path(job_id, '.pdf'))
+    except Exception as e:
+        app.logger.error(f"Error generating background business data export {job_id}: {e}")
+        open(export_job_path(job_id, '.error'), 'w').close()
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+@app.route('/export-business-data', methods=['POST'])
+def start_business_export():
+    """Queue a business data PDF export and return its job id for polling"""
+    try:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        prune_export_jobs()
+        job_id = str(uuid.uuid4())
         
-        if customers:
-            customer_data = [['Customer Name', 'Phone', 'Money to Collect']]
-            
-            for customer in customers[:15]:  # Show only first 15 customers
-                outstanding = customer.outstanding_balance
-                customer_name = customer.name[:25] + '...' if len(customer.name) > 25 else customer.name
-                
-                customer_data.append([
-                    customer_name,
-                    customer.phone,
-                    f"₹{outstanding:,.0f}" if outstanding > 0 else "Paid"
-                ])
-            
-            customer_table = Table(customer_data, colWidths=[2.5*inch, 1.8*inch, 1.5*inch])
-            customer_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2563eb')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('TOPPADDING', (0, 0), (-1, 0), 8),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('TOPPADDING', (0, 1), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6)
-            ]))
-            story.append(customer_table)
-            
-            if len(customers) > 15:
-                story.append(Paragraph(f"Showing 15 out of {len(customers)} customers", summary_style))
-                
-            story.append(Spacer(1, 15))
-            story.append(Paragraph(f"Total Money to Collect: ₹{sum([c.outstanding_balance for c in customers]):,.0f}", normal_style))
-        else:
-            story.append(Paragraph("No customers found", normal_style))
-        
-        # Add branded footer
-        story.append(Spacer(1, 50))
-        
-        # Footer with company branding
-        footer_table = Table([
-            ['Thank you for using Kirana Konnect', 'Report End'],
-            ['© 2024 Kirana Konnect Inc.', f'Page Generated: {datetime.now().strftime("%d-%m-%Y")}']
-        ], colWidths=[3*inch, 3*inch])
-        footer_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8fafc')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#374151')),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, 1), 8),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('LEFTPADDING', (0, 0), (-1, -1), 15),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 15),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e5e7eb'))
-        ]))
-        story.append(footer_table)
-        
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
+        # Mark the job as queued before handing it to the worker thread
+        open(export_job_path(job_id, '.queued'), 'w').close()
+        export_executor.submit(run_business_export_job, job_id)
         
+        return jsonify({'job_id': job_id, 'status_url': f'/export-business-data/{job_id}'}), 202
+    except Exception as e:
+        app.logger.error(f"Error queueing business data export: {e}")
+        return jsonify({'success': False, 'error': 'Failed to start export'}), 500
+
+@app.route('/export-business-data/<uuid:job_id>')
+def get_business_export(job_id):
+    """Download a finished background export, or report that it is still running"""
+    job_id = str(job_id)
+    pdf_path = export_job_path(job_id, '.pdf')
+    error_path = export_job_path(job_id, '.error')
+    
+    if os.path.exists(pdf_path):
+        # Unlink once opened so each finished export is downloaded exactly once
+        pdf_file = open(pdf_path, 'rb')
+        os.remove(pdf_path)
+        stamp_path = export_job_path(job_id, '.generated_at')
+        try:
+            with open(stamp_path) as stamp_file:
+                generated_at = datetime.fromisoformat(stamp_file.read())
+            os.remove(stamp_path)
+        except (OSError, ValueError):
+            generated_at = datetime.now()
         return send_file(
-            buffer,
+            pdf_file,
             as_attachment=True,
-            download_name=f'kirana_business_data_{datetime.now().strftime("%Y%m%d_%H%M")}.pdf',
+            download_name=export_download_name(generated_at),
             mimetype='application/pdf'
         )
-        
-    except Exception as e:
-        logging.error(f"Error generating business data export: {str(e)}")
+    
+    if os.path.exists(error_path):
+        os.remove(error_path)
         return jsonify({'success': False, 'error': 'Failed to generate export'}), 500
+    
+    # Check the queue marker before the build file: a worker renames one into the other
+    for suffix in ('.queued', '.pdf.part'):
+        job_path = export_job_path(job_id, suffix)
+        age = export_job_age(job_path)
+        if age is None:
+            continue
+        if age < EXPORT_JOB_TIMEOUT:
+            return jsonify({'status': 'pending'}), 202
+        # Waited too long in the queue, or the worker building it is gone; a queued job whose
+        # marker is removed here is skipped when a worker reaches it
+        try:
+            os.remove(job_path)
+        except OSError:
+            pass
+        app.logger.error(f"Background business data export {job_id} timed out")
+        return jsonify({'success': False, 'error': 'Export timed out'}), 500
+    
+    return jsonify({'success': False, 'error': 'Export not found'}), 404
 
 @app.route('/api/low-stock-products')
 def api_low_stock_products():
@@ -2020,4 +2567,6 @@ def api_expired_products():
         }), 500
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    if not is_reloader_parent:
+        start_background_jobs()
+    app.run(host='0.0.0.0', port=5000, debug=DEBUG)
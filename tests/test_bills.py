@@ -0,0 +1,32 @@
+import os
+import re
+import tempfile
+import unittest
+
+# app.py configures the database and runs startup setup at import, so point it at a
+# throwaway SQLite file first
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'test.db')
+
+from app import app, db, Bill
+
+
+class BillNumberTest(unittest.TestCase):
+    def test_bill_number_generated_on_sqlite(self):
+        """Bills created on SQLite get unique KK-<year>-<serial> numbers from the INSERT"""
+        with app.app_context():
+            bills = [
+                Bill(customer_name='Walk-in', subtotal=100.0, total_amount=100.0, payment_mode='cash'),
+                Bill(customer_name='Walk-in', subtotal=50.0, total_amount=50.0, payment_mode='cash'),
+            ]
+            db.session.add_all(bills)
+            db.session.commit()
+
+            numbers = [bill.bill_number for bill in bills]
+            for number in numbers:
+                self.assertRegex(number, re.compile(r'^KK-\d{4}-\d{6}$'))
+            self.assertEqual(len(set(numbers)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()